@@ -0,0 +1,92 @@
+import argparse
+import time
+
+from PacketReader import PacketReader
+from VideoProcessor import VideoProcessor
+
+
+def detect_cuts(video_source, content_threshold, frame_ranges=None, max_frames=None):
+    """
+    Runs scene change detection on a video and measures the time it takes.
+
+    Args:
+        video_source (str): Path to the video file.
+        content_threshold (int): Content threshold value for scene change detection.
+        frame_ranges (list, optional): (start, end) frame number tuples to process. Default is None (every frame).
+        max_frames (int, optional): Number of the last frame to process. Default is None (whole video).
+
+    Returns:
+        tuple: Sorted frame numbers of the detected scene changes and the processing time (in seconds).
+    """
+    video_processor = VideoProcessor(video_source=video_source, blur_threshold=0,
+                                     content_threshold=content_threshold, frame_ranges=frame_ranges,
+                                     max_frames=max_frames)
+    start_time = time.time()
+    video_processor.process_video()
+    return sorted(video_processor.detected_frames.keys()), time.time() - start_time
+
+
+def measure_candidate_cuts(video_source, content_threshold=15, window=30, tolerance=2, max_frames=None):
+    """
+    Compares scene change detection limited to the candidate cut ranges against full decode detection.
+
+    Args:
+        video_source (str): Path to the video file.
+        content_threshold (int, optional): Content threshold value for scene change detection. Default is 15.
+        window (int, optional): Number of frames decoded before and after each candidate cut. Default is 30.
+        tolerance (int, optional): Maximum distance (in frames) at which two detected cuts count as the same.
+                                   Default is 2.
+        max_frames (int, optional): Number of the last frame both runs process, the candidate ranges are cut off
+                                    at the same frame. Default is None (whole video).
+
+    Returns:
+        dict: Recall, candidate range coverage, processing times and speedup.
+    """
+    full_cuts, full_time = detect_cuts(video_source, content_threshold, max_frames=max_frames)
+
+    start_time = time.time()
+    frame_ranges = PacketReader(video_source, window=window).find_candidate_ranges(max_frames=max_frames)
+    pre_pass_time = time.time() - start_time
+    candidate_cuts, candidate_time = detect_cuts(video_source, content_threshold, frame_ranges, max_frames)
+    candidate_time += pre_pass_time
+
+    found = [cut for cut in full_cuts
+             if any(abs(cut - candidate_cut) <= tolerance for candidate_cut in candidate_cuts)]
+    # Without usable packet metadata the candidate run falls back to full decode
+    decoded_frames = sum(end - start + 1 for start, end in frame_ranges) if frame_ranges is not None else None
+
+    return {
+        "full_cuts": full_cuts,
+        "candidate_cuts": candidate_cuts,
+        "frame_ranges": frame_ranges,
+        "decoded_frames": decoded_frames,
+        "recall": len(found) / len(full_cuts) if full_cuts else 1.0,
+        "pre_pass_time": pre_pass_time,
+        "full_time": full_time,
+        "candidate_time": candidate_time,
+        "speedup": full_time / candidate_time if candidate_time > 0 else float("inf"),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure recall and speedup of candidate cut detection.")
+    parser.add_argument("sources", nargs="+", help="Paths to the video files to measure.")
+    parser.add_argument("--content-threshold", type=int, default=15)
+    parser.add_argument("--window", type=int, default=30)
+    parser.add_argument("--tolerance", type=int, default=2)
+    parser.add_argument("--max-frames", type=int, default=None,
+                        help="Number of the last frame both runs process. Default is the whole video.")
+    args = parser.parse_args()
+
+    for source in args.sources:
+        result = measure_candidate_cuts(source, content_threshold=args.content_threshold,
+                                        window=args.window, tolerance=args.tolerance, max_frames=args.max_frames)
+        print(source)
+        print("  Full decode cuts: ", result["full_cuts"])
+        print("  Candidate range cuts: ", result["candidate_cuts"])
+        print("  Decoded frames: ", result["decoded_frames"] if result["decoded_frames"] is not None else "all")
+        print(f"  Recall: {result['recall']:.2%}")
+        print(f"  Full decode time (in seconds): {result['full_time']:.3f}")
+        print(f"  Packet pre-pass time (in seconds): {result['pre_pass_time']:.3f}")
+        print(f"  Candidate time incl. packet pre-pass (in seconds): {result['candidate_time']:.3f}")
+        print(f"  Speedup: {result['speedup']:.2f}x")
@@ -7,24 +7,32 @@ class FrameReader:
     Class for reading frames from a video source and adding them to a frame queue.
 
     Attributes:
-        video_source (str): Path to the video file.
+        video_source (str or int): Path to the video file, or index of a live camera.
         frame_queue (Queue): Queue for storing video frames.
         frame_timestamps (dict): Mapping of frame numbers to timestamps and frames.
         is_running (bool): Flag indicating whether the frame reading is running.
+        frame_ranges (list): (start, end) frame number tuples to read, or None to read every frame.
+        max_frames (int): Number of the last frame to read, or None to read up to the end of the video.
     """
 
-    def __init__(self, video_source, frame_queue, frame_timestamps):
+    def __init__(self, video_source, frame_queue, frame_timestamps, frame_ranges=None, max_frames=500):
         """
         Initializes the FrameReader instance.
 
         Args:
-            video_source (str): Path to the video file.
+            video_source (str or int): Path to the video file, or index of a live camera.
             frame_queue (Queue): Queue for storing video frames.
             frame_timestamps (dict): Mapping of frame numbers to timestamps and frames.
+            frame_ranges (list, optional): (start, end) frame number tuples to read, both inclusive.
+                                           Frames outside the ranges are skipped. Default is None (read every frame).
+            max_frames (int, optional): Number of the last frame to read, or None to read up to the end of the
+                                        video. Default is 500.
         """
         self.video_source = video_source
         self.frame_queue = frame_queue
         self.frame_timestamps = frame_timestamps
+        self.frame_ranges = frame_ranges
+        self.max_frames = max_frames
         self.is_running = False
 
     def start_reading(self):
@@ -35,19 +43,41 @@ class FrameReader:
         video_capture = cv2.VideoCapture(self.video_source)
         print("Width: " + str(video_capture.get(3)))
         print("Height: " + str(video_capture.get(3)))
-        frame_count = 0
-        while self.is_running and frame_count < 500:
+        frame_ranges = self.frame_ranges if self.frame_ranges is not None else [(1, None)]
+        for start, end in frame_ranges:
+            if start > 1:
+                # Frame numbers start at 1, the capture position at 0
+                video_capture.set(cv2.CAP_PROP_POS_FRAMES, start - 1)
+            if not self.read_range(video_capture, start - 1, end):
+                break
+
+        self.frame_queue.put(None)
+        video_capture.release()
+
+    def read_range(self, video_capture, frame_count, end):
+        """
+        Reads frames from the current capture position up to the end frame and adds them to the frame queue.
+
+        Args:
+            video_capture (cv2.VideoCapture): Video capture positioned after frame_count.
+            frame_count (int): Number of the frame read last.
+            end (int): Number of the last frame to read, or None to read up to the frame limit.
+
+        Returns:
+            bool: True if reading can continue with the next range, False if it stopped or reached the frame limit.
+        """
+        if end is None or (self.max_frames is not None and end > self.max_frames):
+            end = self.max_frames
+        while end is None or frame_count < end:
+            if not self.is_running:
+                return False
             ret, frame = video_capture.read()
             if not ret:
-                break
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
+                return False
             frame_count += 1
             self.frame_timestamps[frame_count] = (time.time(), frame)
             self.frame_queue.put((frame_count, frame))
-
-        self.frame_queue.put(None)
-        video_capture.release()
+        return self.max_frames is None or frame_count < self.max_frames
 
     def stop_reading(self):
         """
@@ -0,0 +1,214 @@
+import cv2
+import json
+import numpy as np
+import os
+import struct
+
+
+class KeyframeArchive:
+    """
+    Class for storing encoded keyframes and their metrics in a single indexed file.
+
+    The file starts with a header holding a magic and the offset and length of the index, followed by the encoded
+    frames appended one after another. On close, a JSON index mapping frame numbers to their offset, length and
+    metrics is appended and the header is pointed to it. Single frames can therefore be read without scanning the
+    file, and the whole archive can be transferred to the headset as one file.
+
+    Appending never overwrites existing data: new frames and the new index are written after the old index, and
+    the header is only updated once the new index is complete. If the process dies during an append session, the
+    header still points to the old index, so the previously archived frames stay readable. A new archive that was
+    never closed has no index and reads as empty. Each append session that adds frames leaves the previous index
+    behind as unused bytes, compact() rewrites the archive without them.
+
+    Attributes:
+        path (str): Path to the archive file.
+        mode (str): "r" to read, "w" to create a new archive, "a" to append to an existing archive.
+        image_format (str): Image format the frames are encoded with, e.g. ".jpg".
+        index (dict): Mapping of frame numbers to entries with the offset, length and metrics of the frame.
+    """
+
+    MAGIC = b"SCDKFA01"
+    HEADER = struct.Struct("<8sQQ")
+
+    def __init__(self, path, mode="r", image_format=".jpg"):
+        """
+        Initializes the KeyframeArchive instance and opens the archive file.
+
+        Args:
+            path (str): Path to the archive file.
+            mode (str, optional): "r" to read, "w" to create a new archive, "a" to append to an existing archive.
+                                  Default is "r".
+            image_format (str, optional): Image format the frames are encoded with. Default is ".jpg".
+        """
+        if mode not in ("r", "w", "a"):
+            raise ValueError(f"Invalid archive mode: {mode}")
+
+        self.path = path
+        self.mode = mode
+        self.image_format = image_format
+        self.index = {}
+        self._index_written = False
+
+        if mode == "a" and not os.path.exists(path):
+            mode = "w"
+
+        if mode == "w":
+            self._file = open(path, "w+b")
+            # An index offset of 0 marks an archive that has not been closed yet
+            self._file.write(self.HEADER.pack(self.MAGIC, 0, 0))
+        else:
+            self._file = open(path, "rb" if mode == "r" else "r+b")
+            self._read_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __contains__(self, frame_num):
+        return frame_num in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def frame_nums(self):
+        """
+        Returns the frame numbers stored in the archive.
+
+        Returns:
+            list: Sorted frame numbers.
+        """
+        return sorted(self.index.keys())
+
+    def metadata(self, frame_num):
+        """
+        Returns the metrics stored for a frame.
+
+        Args:
+            frame_num (int): Frame number.
+
+        Returns:
+            dict: The metrics of the frame, e.g. blur value and elapsed time.
+        """
+        return self.index[frame_num]["metrics"]
+
+    def add(self, frame_num, frame, **metadata):
+        """
+        Encodes a frame and appends it to the archive. Frames already in the archive are skipped.
+
+        Args:
+            frame_num (int): Frame number.
+            frame: The frame to store.
+            **metadata: Metrics stored with the frame, e.g. blur value and elapsed time.
+        """
+        if frame_num in self.index:
+            return
+        ret, encoded = cv2.imencode(self.image_format, frame)
+        if not ret:
+            raise ValueError(f"Could not encode frame {frame_num} as {self.image_format}")
+        self.add_encoded(frame_num, encoded.tobytes(), **metadata)
+
+    def add_encoded(self, frame_num, data, **metadata):
+        """
+        Appends an already encoded frame to the archive. Frames already in the archive are skipped.
+
+        Args:
+            frame_num (int): Frame number.
+            data (bytes): The encoded frame.
+            **metadata: Metrics stored with the frame, e.g. blur value and elapsed time.
+        """
+        if self.mode == "r":
+            raise ValueError("Archive is opened for reading")
+        if frame_num in self.index:
+            return
+
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        self._file.write(data)
+        self.index[frame_num] = {"offset": offset, "length": len(data), "metrics": metadata}
+        self._index_written = False
+
+    def read_encoded(self, frame_num):
+        """
+        Reads the encoded bytes of a frame without decoding them.
+
+        Args:
+            frame_num (int): Frame number.
+
+        Returns:
+            bytes: The encoded frame.
+        """
+        entry = self.index[frame_num]
+        self._file.seek(entry["offset"])
+        return self._file.read(entry["length"])
+
+    def read(self, frame_num):
+        """
+        Reads and decodes a frame.
+
+        Args:
+            frame_num (int): Frame number.
+
+        Returns:
+            The decoded frame.
+        """
+        data = self.read_encoded(frame_num)
+        return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    def close(self):
+        """
+        Writes the index and points the header to it if frames were added or the archive is new, and closes the file.
+        """
+        if self._file.closed:
+            return
+
+        if self.mode != "r" and not self._index_written:
+            self._file.seek(0, os.SEEK_END)
+            index_offset = self._file.tell()
+            index = {"image_format": self.image_format,
+                     "frames": {str(frame_num): entry for frame_num, entry in self.index.items()}}
+            data = json.dumps(index).encode("utf-8")
+            self._file.write(data)
+            # The index has to be on disk before the header refers to it
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.seek(0)
+            self._file.write(self.HEADER.pack(self.MAGIC, index_offset, len(data)))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._file.close()
+
+    @classmethod
+    def compact(cls, path):
+        """
+        Rewrites an archive without the indexes left behind by earlier append sessions.
+
+        The compacted archive is written to a temporary file that replaces the original only once it is complete.
+
+        Args:
+            path (str): Path to the archive file.
+        """
+        temp_path = path + ".tmp"
+        with cls(path, mode="r") as source, cls(temp_path, mode="w", image_format=source.image_format) as target:
+            for frame_num in source.frame_nums():
+                target.add_encoded(frame_num, source.read_encoded(frame_num), **source.metadata(frame_num))
+        os.replace(temp_path, path)
+
+    def _read_index(self):
+        """
+        Reads the index of an existing archive. An archive that was never closed has no index and is empty.
+        """
+        self._file.seek(0)
+        header = self._file.read(self.HEADER.size)
+        if len(header) < self.HEADER.size or not header.startswith(self.MAGIC):
+            raise ValueError(f"{self.path} is not a keyframe archive")
+        magic, index_offset, index_length = self.HEADER.unpack(header)
+        if index_offset == 0:
+            return
+        self._index_written = True
+
+        self._file.seek(index_offset)
+        index = json.loads(self._file.read(index_length))
+        self.image_format = index["image_format"]
+        self.index = {int(frame_num): entry for frame_num, entry in index["frames"].items()}
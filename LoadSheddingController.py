@@ -0,0 +1,189 @@
+import time
+
+
+# Quality levels ordered from full fidelity to the cheapest analysis we are willing to run.
+#   analysis_scale: Factor applied to the frame size before scene change detection.
+#   frame_skip: Only every n-th frame is analysed.
+#   blur_enabled: Whether the BlurDetector runs during processing.
+DEFAULT_QUALITY_LEVELS = [
+    {"name": "full", "analysis_scale": 1.0, "frame_skip": 1, "blur_enabled": True},
+    {"name": "half-res", "analysis_scale": 0.5, "frame_skip": 1, "blur_enabled": True},
+    {"name": "half-res-no-blur", "analysis_scale": 0.5, "frame_skip": 1, "blur_enabled": False},
+    {"name": "quarter-res-skip-2", "analysis_scale": 0.25, "frame_skip": 2, "blur_enabled": False},
+    {"name": "quarter-res-skip-4", "analysis_scale": 0.25, "frame_skip": 4, "blur_enabled": False},
+]
+
+
+class LoadSheddingController:
+    """
+    Class for adapting the analysis quality so that processing keeps up with the source frame rate.
+
+    The controller watches how far processing lags behind the source time of the frames and the
+    per-frame processing time. For live sources, the frame queue depth is taken into account as well.
+    When processing falls behind the target frame rate it steps the quality level down, and when there
+    is enough headroom it steps back up. Both directions require the condition to hold for several consecutive
+    frames, so the level does not oscillate.
+
+    Attributes:
+        target_fps (float): Frame rate the processing has to keep up with.
+        frame_budget (float): Processing time available per source frame (in seconds).
+        max_lag (float): Lag behind the source time (in seconds) above which processing is considered behind.
+        max_queue_depth (int): Queue depth of a live source above which processing is considered behind.
+        quality_levels (list): Quality levels ordered from highest to lowest fidelity.
+        degrade_after (int): Consecutive behind frames required before stepping down.
+        recover_after (int): Consecutive headroom frames required before stepping up.
+        headroom_ratio (float): Fraction of the frame budget the processing time has to stay below to step up.
+        level_index (int): Index of the current quality level.
+        avg_processing_time (float): Exponentially smoothed processing time per analysed frame.
+        lag (float): Wall-clock time minus source time of the last analysed frame (in seconds).
+        level_changes (list): Log of quality level changes.
+        frames_per_level (dict): Mapping of quality level names to the number of frames analysed at that level.
+    """
+
+    def __init__(self, target_fps, max_lag=1.0, max_queue_depth=30, quality_levels=None, degrade_after=5,
+                 recover_after=60, headroom_ratio=0.5, smoothing=0.2):
+        """
+        Initializes the LoadSheddingController.
+
+        Args:
+            target_fps (float): Frame rate the processing has to keep up with.
+            max_lag (float, optional): Lag behind the source time (in seconds) above which processing is
+                                       considered behind. Default is 1.0.
+            max_queue_depth (int, optional): Queue depth of a live source above which processing is considered
+                                             behind. Default is 30.
+            quality_levels (list, optional): Quality levels ordered from highest to lowest fidelity.
+                                             Default is DEFAULT_QUALITY_LEVELS.
+            degrade_after (int, optional): Consecutive behind frames required before stepping down. Default is 5.
+            recover_after (int, optional): Consecutive headroom frames required before stepping up. Default is 60.
+            headroom_ratio (float, optional): Fraction of the frame budget the processing time has to stay below
+                                              to step up. Default is 0.5.
+            smoothing (float, optional): Weight of the newest sample in the smoothed processing time. Default is 0.2.
+        """
+        self.target_fps = target_fps
+        self.frame_budget = 1.0 / target_fps
+        self.max_lag = max_lag
+        self.max_queue_depth = max_queue_depth
+        self.quality_levels = quality_levels if quality_levels is not None else DEFAULT_QUALITY_LEVELS
+        self.degrade_after = degrade_after
+        self.recover_after = recover_after
+        self.headroom_ratio = headroom_ratio
+        self.smoothing = smoothing
+
+        self.level_index = 0
+        self.avg_processing_time = None
+        self.lag = 0.0
+        self.level_changes = []
+        self.frames_per_level = {level["name"]: 0 for level in self.quality_levels}
+
+        self._behind_count = 0
+        self._headroom_count = 0
+        self._start_time = None
+        self._start_frame_num = None
+
+    @property
+    def current_level(self):
+        """
+        Returns the current quality level.
+        """
+        return self.quality_levels[self.level_index]
+
+    def should_analyze(self, frame_num):
+        """
+        Checks whether a frame has to be analysed at the current quality level.
+
+        Args:
+            frame_num (int): Frame number.
+
+        Returns:
+            bool: True if the frame should be analysed, False if it is skipped.
+        """
+        return frame_num % self.current_level["frame_skip"] == 0
+
+    def start(self):
+        """
+        Marks the start of processing, the source time of the first frame is aligned to it.
+        """
+        self._start_time = time.time()
+        self._start_frame_num = None
+
+    def update(self, frame_num, processing_time, queue_depth=None):
+        """
+        Records the processing time of an analysed frame and adjusts the quality level if required.
+
+        Args:
+            frame_num (int): Frame number of the analysed frame.
+            processing_time (float): Time spent analysing the frame (in seconds).
+            queue_depth (int, optional): Number of frames waiting in the frame queue. Only meaningful for live
+                                         sources, a file is read ahead as fast as it decodes. Default is None.
+
+        Returns:
+            dict: The quality level to use for the next frame.
+        """
+        self.frames_per_level[self.current_level["name"]] += 1
+
+        if self._start_time is None:
+            self._start_time = time.time() - processing_time
+        if self._start_frame_num is None:
+            self._start_frame_num = frame_num
+        source_time = (frame_num - self._start_frame_num) / self.target_fps
+        self.lag = (time.time() - self._start_time) - source_time
+
+        if self.avg_processing_time is None:
+            self.avg_processing_time = processing_time
+        else:
+            self.avg_processing_time = (self.smoothing * processing_time
+                                        + (1 - self.smoothing) * self.avg_processing_time)
+
+        # Skipped frames are free, so the cost per source frame is spread over the skip interval
+        cost_per_frame = self.avg_processing_time / self.current_level["frame_skip"]
+        queue_behind = queue_depth is not None and queue_depth > self.max_queue_depth
+        queue_headroom = queue_depth is None or queue_depth <= self.max_queue_depth // 4
+        behind = queue_behind or self.lag > self.max_lag or cost_per_frame > self.frame_budget
+        headroom = (queue_headroom and self.lag <= self.max_lag / 4
+                    and cost_per_frame < self.headroom_ratio * self.frame_budget)
+
+        if behind:
+            self._behind_count += 1
+            self._headroom_count = 0
+        elif headroom:
+            self._headroom_count += 1
+            self._behind_count = 0
+        else:
+            self._behind_count = 0
+            self._headroom_count = 0
+
+        if self._behind_count >= self.degrade_after and self.level_index < len(self.quality_levels) - 1:
+            self._set_level(self.level_index + 1, frame_num, queue_depth, "behind")
+        elif self._headroom_count >= self.recover_after and self.level_index > 0:
+            self._set_level(self.level_index - 1, frame_num, queue_depth, "headroom")
+
+        return self.current_level
+
+    def _set_level(self, level_index, frame_num, queue_depth, reason):
+        """
+        Switches to a new quality level and logs the change.
+
+        Args:
+            level_index (int): Index of the new quality level.
+            frame_num (int): Frame number at which the change happens.
+            queue_depth (int): Number of frames waiting in the frame queue, or None for file sources.
+            reason (str): Why the level changed ("behind" or "headroom").
+        """
+        change = {
+            "frame_num": frame_num,
+            "time": time.time(),
+            "from": self.current_level["name"],
+            "to": self.quality_levels[level_index]["name"],
+            "reason": reason,
+            "queue_depth": queue_depth,
+            "lag": self.lag,
+            "avg_processing_time": self.avg_processing_time,
+        }
+        self.level_changes.append(change)
+        print(f"Quality level changed at frame {frame_num}: {change['from']} -> {change['to']} "
+              f"({reason}, lag {self.lag:.3f}s, queue depth {queue_depth}, "
+              f"avg processing time {self.avg_processing_time:.4f}s)")
+
+        self.level_index = level_index
+        self._behind_count = 0
+        self._headroom_count = 0
@@ -0,0 +1,171 @@
+import av
+import statistics
+
+
+class PacketReader:
+    """
+    Class for finding candidate scene cut regions in a video from its packet metadata, without decoding any frames.
+
+    Encoders insert keyframes at scene cuts ahead of their regular keyframe interval, and the first inter frames
+    after a cut are much larger than those of a static scene. Both are visible in the container packets, so the
+    frames that need full decoding can be narrowed down before FrameReader runs.
+
+    Attributes:
+        video_source (str): Path to the video file.
+        window (int): Number of frames decoded before and after each candidate cut.
+        size_ratio (float): Ratio to the median packet size above which a packet counts as a candidate cut.
+        size_history (int): Number of preceding inter frame packets the median packet size is taken over.
+        packets (list): (frame_num, size, is_keyframe) tuples of the video packets in presentation order,
+                        or None if the packets have not been read yet.
+        unusable_reason (str): Why the packet metadata cannot be used to find cuts, or None if it can be used.
+    """
+
+    def __init__(self, video_source, window=30, size_ratio=3.0, size_history=30):
+        """
+        Initializes the PacketReader instance.
+
+        Args:
+            video_source (str): Path to the video file.
+            window (int, optional): Number of frames decoded before and after each candidate cut, at least 1 so
+                                    that the cut frame can be compared to the frame before it. Default is 30.
+            size_ratio (float, optional): Ratio to the median packet size above which a packet counts as a
+                                          candidate cut. Default is 3.0.
+            size_history (int, optional): Number of preceding inter frame packets the median packet size is
+                                          taken over. Default is 30.
+        """
+        if window < 1:
+            raise ValueError(f"Candidate window must be at least 1 frame, got {window}")
+
+        self.video_source = video_source
+        self.window = window
+        self.size_ratio = size_ratio
+        self.size_history = size_history
+        self.packets = None
+        self.unusable_reason = None
+
+    def read_packets(self, max_frames=None):
+        """
+        Reads the packet metadata of the first video stream without decoding it.
+
+        Frame numbers start at 1, matching the numbering used by FrameReader. If the metadata cannot be mapped
+        to frames or does not distinguish keyframes from inter frames, unusable_reason is set.
+
+        Args:
+            max_frames (int, optional): Number of the last frame that will be processed. Demuxing stops once the
+                                        packets pass it by more than the window. Default is None (whole video).
+
+        Returns:
+            list: (frame_num, size, is_keyframe) tuples in presentation order.
+        """
+        self.packets = []
+        self.unusable_reason = None
+
+        with av.open(self.video_source) as container:
+            stream = container.streams.video[0]
+            rate = stream.average_rate or stream.guessed_rate
+            if rate is None or stream.time_base is None:
+                self.unusable_reason = "the stream has no frame rate or time base"
+                return self.packets
+            fps = float(rate)
+            time_base = float(stream.time_base)
+
+            last_frame = max_frames + self.window if max_frames is not None else None
+            packets = []
+            for packet in container.demux(stream):
+                # Flushing packets at the end of the stream carry no data
+                if packet.size == 0:
+                    continue
+                if packet.pts is None:
+                    self.unusable_reason = "the packets have no presentation timestamps"
+                    return self.packets
+                packets.append((packet.pts, packet.size, packet.is_keyframe))
+                if last_frame is not None and (packet.pts - packets[0][0]) * time_base * fps + 1 > last_frame:
+                    break
+
+        if not packets:
+            self.unusable_reason = "the stream has no packets"
+            return self.packets
+        if all(is_keyframe for pts, size, is_keyframe in packets):
+            self.unusable_reason = "every frame is a keyframe"
+            return self.packets
+
+        packets.sort()
+        start_pts = packets[0][0]
+        self.packets = [(int(round((pts - start_pts) * time_base * fps)) + 1, size, is_keyframe)
+                        for pts, size, is_keyframe in packets]
+        return self.packets
+
+    def find_candidate_cuts(self, max_frames=None):
+        """
+        Finds the frame numbers of candidate scene cuts from keyframe positions and packet size spikes.
+
+        Args:
+            max_frames (int, optional): Number of the last frame that will be processed, passed to read_packets()
+                                        if the packets have not been read yet. Default is None (whole video).
+
+        Returns:
+            list: Sorted frame numbers of the candidate cuts, empty if the packet metadata cannot be used.
+        """
+        if self.packets is None:
+            self.read_packets(max_frames)
+        if self.unusable_reason is not None:
+            return []
+
+        keyframes = [frame_num for frame_num, size, is_keyframe in self.packets if is_keyframe]
+        keyframe_intervals = [b - a for a, b in zip(keyframes, keyframes[1:])]
+        # The regular keyframe interval of the encoder, keyframes placed earlier were inserted for a scene cut.
+        # It is the largest interval that repeats, in a short video with no repeating interval the largest one.
+        repeated_intervals = [interval for interval in keyframe_intervals if keyframe_intervals.count(interval) > 1]
+        gop_size = max(repeated_intervals or keyframe_intervals) if keyframe_intervals else None
+
+        candidates = set()
+        for previous, keyframe in zip(keyframes, keyframes[1:]):
+            if keyframe - previous < gop_size:
+                candidates.add(keyframe)
+
+        inter_sizes = []
+        for frame_num, size, is_keyframe in self.packets:
+            if is_keyframe:
+                continue
+            recent_sizes = inter_sizes[-self.size_history:]
+            if len(recent_sizes) >= self.size_history // 2 and size > self.size_ratio * statistics.median(recent_sizes):
+                candidates.add(frame_num)
+            inter_sizes.append(size)
+
+        return sorted(candidates)
+
+    def find_candidate_ranges(self, max_frames=None):
+        """
+        Finds the frame ranges around the candidate cuts that need full decoding.
+
+        Args:
+            max_frames (int, optional): Number of the last frame that will be processed. Ranges are cut off at it.
+                                        Default is None (no limit).
+
+        Returns:
+            list: Sorted, non-overlapping (start, end) frame number tuples, both inclusive, or None if the packet
+                  metadata cannot be used and every frame has to be decoded.
+        """
+        cuts = self.find_candidate_cuts(max_frames)
+        if self.unusable_reason is not None:
+            print(f"Packet metadata of {self.video_source} cannot be used ({self.unusable_reason}), "
+                  f"falling back to full decode")
+            return None
+
+        if max_frames is not None and cuts and cuts[-1] > max_frames:
+            print(f"{len([cut for cut in cuts if cut > max_frames])} candidate cuts of {self.video_source} "
+                  f"lie after the frame limit of {max_frames} and are ignored")
+
+        ranges = []
+        for frame_num in cuts:
+            start = max(1, frame_num - self.window)
+            end = frame_num + self.window
+            if max_frames is not None:
+                if start > max_frames:
+                    break
+                end = min(end, max_frames)
+            if ranges and start <= ranges[-1][1] + 1:
+                ranges[-1] = (ranges[-1][0], max(ranges[-1][1], end))
+            else:
+                ranges.append((start, end))
+        return ranges
@@ -11,9 +11,11 @@ class SceneChangeDetector:
         frame_timestamps (dict): Mapping of frame numbers to timestamps and frames.
         detected_frames (dict): Mapping of detected scene change frame numbers to frames and elapsed time.
         content_threshold (int): Content threshold value for scene change detection.
+        min_scene_len (int): Minimum number of frames between two scene changes.
+        last_cut_frame (int): Frame number of the last scene change, or of the first frame of the video.
     """
 
-    def __init__(self, frame_timestamps, detected_frames, content_threshold):
+    def __init__(self, frame_timestamps, detected_frames, content_threshold, min_scene_len=20):
         """
         Initializes the SceneChangeDetector.
 
@@ -21,12 +23,43 @@ class SceneChangeDetector:
             frame_timestamps (dict): Mapping of frame numbers to timestamps and frames.
             detected_frames (dict): Mapping of detected scene change frame numbers to frames and elapsed time.
             content_threshold (int): Content threshold value for scene change detection.
+            min_scene_len (int, optional): Minimum number of frames between two scene changes. Default is 20.
         """
+        self.content_threshold = content_threshold
+        self.min_scene_len = min_scene_len
+        # Cuts within min_scene_len frames of the start of the video are ignored, as the ContentDetector does
+        self.last_cut_frame = 1
         self.scene_manager = SceneManager()
-        self.scene_manager.add_detector(ContentDetector(threshold=content_threshold, min_scene_len=20))
+        self.scene_manager.add_detector(self.create_detector())
         self.frame_timestamps = frame_timestamps
         self.detected_frames = detected_frames
 
+    def create_detector(self):
+        """
+        Creates the ContentDetector.
+
+        The minimum scene length is enforced in scene_change_callback instead of the ContentDetector, so that it
+        carries over when the detector is reset within a video.
+
+        Returns:
+            ContentDetector: The new detector.
+        """
+        return ContentDetector(threshold=self.content_threshold, min_scene_len=1)
+
+    def reset(self, new_video=False):
+        """
+        Resets the detection state, so that the next frame is not compared to the previous one.
+
+        Args:
+            new_video (bool, optional): Whether the next frame starts a new video source. Otherwise the last scene
+                                        change is kept for the minimum scene length. Default is False.
+        """
+        self.scene_manager.clear()
+        self.scene_manager.clear_detectors()
+        self.scene_manager.add_detector(self.create_detector())
+        if new_video:
+            self.last_cut_frame = 1
+
     def scene_change_callback(self, frame, frame_num):
         """
         Callback function for scene change detection.
@@ -35,10 +68,15 @@ class SceneChangeDetector:
             frame_num (int): Frame number associated with the scene change.
             frame: Frame associated with the scene change.
         """
+        if frame_num - self.last_cut_frame < self.min_scene_len:
+            return
+        self.last_cut_frame = frame_num
+
         frame_time, frame_data = self.frame_timestamps[frame_num]
         elapsed_time = time.time() - frame_time
 
-        self.detected_frames[frame_num] = (frame, elapsed_time)
+        # Store the original frame, the frame passed to the detector may have been downscaled for analysis
+        self.detected_frames[frame_num] = (frame_data, elapsed_time)
 
     def process_frame(self, frame_num, frame):
         """
@@ -2,8 +2,11 @@ import cv2
 import os
 import threading
 import queue
+import time
 
 from BlurDetector import BlurDetector
+from KeyframeArchive import KeyframeArchive
+from LoadSheddingController import LoadSheddingController
 from SceneChangeDetector import SceneChangeDetector
 from FrameReader import FrameReader
 
@@ -13,7 +16,7 @@ class VideoProcessor:
     Class for processing a video by detecting scene changes and blur frames.
 
     Attributes:
-        video_source (str): Path to the video file.
+        video_source (str or int): Path to the video file, or index of a live camera.
         save_scene_changes (bool): Flag indicating whether to save the detected scene changes.
         save_blur_frames (bool): Flag indicating whether to save frames below the blur threshold.
         blur_threshold (float): Blur threshold value.
@@ -25,24 +28,57 @@ class VideoProcessor:
         scene_detector (SceneChangeDetector): SceneChangeDetector instance for scene change detection.
         frame_reader (FrameReader): FrameReader instance for reading video frames.
         blur_detector (BlurDetector): BlurDetector instance for blur detection.
+        quality_controller (LoadSheddingController): Controller adapting the analysis quality to the target frame
+                                                     rate, or None if load shedding is disabled.
+        quality_history (dict): Mapping of processed video sources to their LoadSheddingController, which records
+                                the quality level changes and frames analysed per level of that source.
+        scene_changes_dir (str): Output directory for the detected scene change frames.
+        blur_frames_dir (str): Output directory for the frames above the blur threshold.
+        frame_ranges (list): (start, end) frame number tuples to process, or None to process every frame.
+        output_format (str): "jpg" to save one JPEG file per frame, "archive" to append the frames and their metrics
+                             to a single KeyframeArchive file per output directory.
+        max_frames (int): Number of the last frame to process, or None to process up to the end of the video.
     """
 
-    def __init__(self, video_source, blur_threshold, content_threshold, save_scene_changes=False, save_blur_frames=False):
+    def __init__(self, video_source, blur_threshold, content_threshold, save_scene_changes=False, save_blur_frames=False,
+                 target_fps=None, scene_changes_dir="scene_changes", blur_frames_dir="no_blur_scene_changes",
+                 frame_ranges=None, output_format="jpg", max_frames=500):
         """
         Initializes the VideoProcessor instance.
 
         Args:
-            video_source (str): Path to the video file.
+            video_source (str or int): Path to the video file, or index of a live camera.
             blur_threshold (float): Blur threshold value.
             content_threshold (int): Content threshold value for scene change detection.
             save_scene_changes (bool): Flag indicating whether to save the detected scene changes.
             save_blur_frames (bool): Flag indicating whether to save frames above the blur threshold.
+            target_fps (float, optional): Frame rate processing has to keep up with. If set, the analysis quality
+                                          is stepped down when processing falls behind. Default is None.
+            scene_changes_dir (str, optional): Output directory for the detected scene change frames.
+                                               Default is "scene_changes".
+            blur_frames_dir (str, optional): Output directory for the frames above the blur threshold.
+                                             Default is "no_blur_scene_changes".
+            frame_ranges (list, optional): (start, end) frame number tuples to process, both inclusive, e.g. the
+                                           candidate ranges found by PacketReader. Default is None (every frame).
+            output_format (str, optional): "jpg" to save one JPEG file per frame, "archive" to save the frames and
+                                           their metrics to a single KeyframeArchive file. Default is "jpg".
+            max_frames (int, optional): Number of the last frame to process, or None to process up to the end of
+                                        the video. Default is 500.
         """
+        if output_format not in ("jpg", "archive"):
+            raise ValueError(f"Invalid output format: {output_format}")
+
         self.video_source = video_source
         self.save_scene_changes = save_scene_changes
         self.save_blur_frames = save_blur_frames
         self.blur_threshold = blur_threshold
         self.content_threshold = content_threshold
+        self.target_fps = target_fps
+        self.scene_changes_dir = scene_changes_dir
+        self.blur_frames_dir = blur_frames_dir
+        self.frame_ranges = frame_ranges
+        self.output_format = output_format
+        self.max_frames = max_frames
 
         self.frame_queue = queue.Queue()
         self.frame_timestamps = {}
@@ -58,8 +94,45 @@ class VideoProcessor:
             video_source=self.video_source,
             frame_queue=self.frame_queue,
             frame_timestamps=self.frame_timestamps,
+            frame_ranges=self.frame_ranges,
+            max_frames=self.max_frames,
         )
         self.blur_detector = BlurDetector(blur_map=self.blur_map)
+        self.quality_controller = LoadSheddingController(target_fps=target_fps) if target_fps else None
+        self.quality_history = {}
+
+    def load_source(self, video_source, scene_changes_dir=None, blur_frames_dir=None, frame_ranges=None):
+        """
+        Prepares the processor for a new video source, reusing the already initialized detectors.
+
+        Args:
+            video_source (str or int): Path to the video file, or index of a live camera.
+            scene_changes_dir (str, optional): Output directory for the detected scene change frames.
+                                               Keeps the current directory if not given.
+            blur_frames_dir (str, optional): Output directory for the frames above the blur threshold.
+                                             Keeps the current directory if not given.
+            frame_ranges (list, optional): (start, end) frame number tuples to process, both inclusive.
+                                           Default is None (every frame).
+        """
+        self.video_source = video_source
+        self.frame_ranges = frame_ranges
+        if scene_changes_dir is not None:
+            self.scene_changes_dir = scene_changes_dir
+        if blur_frames_dir is not None:
+            self.blur_frames_dir = blur_frames_dir
+
+        # The maps are shared by reference with the detectors and the frame reader, so they are cleared in place
+        self.frame_timestamps.clear()
+        self.blur_map.clear()
+        self.detected_frames.clear()
+
+        self.frame_queue = queue.Queue()
+        self.frame_reader.frame_queue = self.frame_queue
+        self.frame_reader.video_source = video_source
+        self.frame_reader.frame_ranges = frame_ranges
+        self.scene_detector.reset(new_video=True)
+        if self.quality_controller:
+            self.quality_controller = LoadSheddingController(target_fps=self.target_fps)
 
     def process_video(self):
         """
@@ -67,9 +140,14 @@ class VideoProcessor:
         """
         frame_reader_thread = threading.Thread(target=self.frame_reader.start_reading)
         frame_reader_thread.start()
+        if self.quality_controller:
+            self.quality_controller.start()
 
         current_frame_count = 0
-        while current_frame_count < 500:
+        last_read_frame = None
+        last_analysed = None
+        analysis_scale = 1.0
+        while self.max_frames is None or current_frame_count < self.max_frames:
             if self.frame_queue.qsize() == 0:
                 continue
             frame_info = self.frame_queue.get()
@@ -78,72 +156,192 @@ class VideoProcessor:
 
             frame_num, frame = frame_info
 
-            # Create separate threads for concurrent processing of frames by the BlurDetector and SceneChangeDetector
-            blur_thread = threading.Thread(target=self.blur_detector.calculate_blur, args=(frame_num, frame))
-            scene_thread = threading.Thread(target=self.scene_detector.process_frame, args=(frame_num, frame))
+            # Frames between two ranges were never read, so the next range must not be compared to the previous one
+            if last_read_frame is not None and frame_num != last_read_frame + 1:
+                self.scene_detector.reset()
+                last_analysed = None
+            last_read_frame = frame_num
 
+            quality_level = self.quality_controller.current_level if self.quality_controller else None
+            if quality_level is not None and not self.quality_controller.should_analyze(frame_num):
+                current_frame_count = frame_num
+                continue
+
+            start_time = time.time()
+
+            analysis_frame = frame
+            if quality_level is not None:
+                if quality_level["analysis_scale"] != analysis_scale:
+                    analysis_scale = quality_level["analysis_scale"]
+                    # The ContentDetector diffs against the last frame, which has to be of the same size. The
+                    # previous frame is fed again at the new size, so that the current one is still compared to it.
+                    self.scene_detector.reset()
+                    if last_analysed is not None:
+                        previous_num, previous_frame = last_analysed
+                        self.scene_detector.process_frame(previous_num,
+                                                          self.scale_frame(previous_frame, analysis_scale))
+                analysis_frame = self.scale_frame(frame, analysis_scale)
+
+            # Create separate threads for concurrent processing of frames by the BlurDetector and SceneChangeDetector
+            errors = []
+            scene_thread = threading.Thread(target=self.run_worker,
+                                            args=(errors, self.scene_detector.process_frame, frame_num, analysis_frame))
             scene_thread.start()
-            blur_thread.start()
 
-            blur_thread.join()
+            # Blur is always measured on the full resolution frame so that the values stay comparable to the threshold
+            blur_thread = None
+            if quality_level is None or quality_level["blur_enabled"]:
+                blur_thread = threading.Thread(target=self.run_worker,
+                                               args=(errors, self.blur_detector.calculate_blur, frame_num, frame))
+                blur_thread.start()
+
+            if blur_thread is not None:
+                blur_thread.join()
             scene_thread.join()
 
+            if errors:
+                self.frame_reader.stop_reading()
+                frame_reader_thread.join()
+                raise errors[0]
+
+            last_analysed = (frame_num, frame)
+
+            if self.quality_controller:
+                # A file is read ahead as fast as it decodes, so the queue depth only tells something for live sources
+                queue_depth = self.frame_queue.qsize() if isinstance(self.video_source, int) else None
+                self.quality_controller.update(frame_num, time.time() - start_time, queue_depth)
+
             current_frame_count = frame_num
 
         frame_reader_thread.join()
 
+        if self.quality_controller:
+            self.quality_history[self.video_source] = self.quality_controller
+            print("Frames analysed per quality level: ", self.quality_controller.frames_per_level)
+
         if self.save_scene_changes:
             self.save_detected_frames()
 
         if self.save_blur_frames:
             self.save_blur_threshold_frames()
 
+    @staticmethod
+    def scale_frame(frame, scale):
+        """
+        Scales a frame for scene change detection.
+
+        Args:
+            frame: The input frame.
+            scale (float): Factor applied to the frame size.
+
+        Returns:
+            The scaled frame, or the input frame if the scale is 1.0.
+        """
+        if scale == 1.0:
+            return frame
+        return cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    @staticmethod
+    def run_worker(errors, target, *args):
+        """
+        Runs a detector in a worker thread and collects its exception, so that it can be raised in the main thread.
+
+        Args:
+            errors (list): List the exception is appended to.
+            target: The detector method to run.
+            *args: Arguments passed to the detector method.
+        """
+        try:
+            target(*args)
+        except Exception as e:
+            errors.append(e)
+
+    def get_blur_value(self, frame_num):
+        """
+        Returns the blur value of a frame, calculating it on demand if the frame was not measured during processing.
+
+        Args:
+            frame_num (int): Frame number.
+
+        Returns:
+            float: The blur value of the frame.
+        """
+        if frame_num not in self.blur_map:
+            frame_time, frame_data = self.frame_timestamps[frame_num]
+            self.blur_detector.calculate_blur(frame_num, frame_data)
+        return self.blur_map[frame_num]
+
     def save_detected_frames(self):
         """
         Saves the detected scene change frames to the output directory.
         """
-        output_dir = "scene_changes"
+        output_dir = self.scene_changes_dir
         os.makedirs(output_dir, exist_ok=True)
 
-        for frame_num in self.detected_frames.keys():
-            frame, elapsed_time = self.detected_frames[frame_num]
+        archive = self.open_archive(output_dir)
+        try:
+            for frame_num in self.detected_frames.keys():
+                frame, elapsed_time = self.detected_frames[frame_num]
+                blur_value = self.get_blur_value(frame_num)
 
-            print("Scene change detected:")
-            print("  Frame Num: ", frame_num)
-            print("  Blur Value: ", self.blur_map[frame_num])
-            print("  Time Elapsed since start (in seconds): ", elapsed_time)
-            output_path = os.path.join(output_dir, f"frame_{frame_num}.jpg")
-            cv2.imwrite(output_path, frame)
+                print("Scene change detected:")
+                print("  Frame Num: ", frame_num)
+                print("  Blur Value: ", blur_value)
+                print("  Time Elapsed since start (in seconds): ", elapsed_time)
+                if archive is not None:
+                    archive.add(frame_num, frame, blur_value=blur_value, elapsed_time=elapsed_time)
+                else:
+                    output_path = os.path.join(output_dir, f"frame_{frame_num}.jpg")
+                    cv2.imwrite(output_path, frame)
+        finally:
+            if archive is not None:
+                archive.close()
 
     def save_blur_threshold_frames(self):
         """
         Saves the frames above the blur threshold to the output directory.
         """
-        output_dir = "no_blur_scene_changes"
+        output_dir = self.blur_frames_dir
         os.makedirs(output_dir, exist_ok=True)
 
-        current_frame_count = 1
-        for frame_num in sorted(self.detected_frames.keys()):
-            if current_frame_count > frame_num:
-                continue
+        archive = self.open_archive(output_dir)
+        try:
+            current_frame_count = 1
+            for frame_num in sorted(self.detected_frames.keys()):
+                if current_frame_count > frame_num:
+                    continue
 
-            current_frame_count = frame_num
-            while current_frame_count < 500 and self.blur_map[current_frame_count] < self.blur_threshold:
-                current_frame_count += 1
+                current_frame_count = frame_num
+                while ((self.max_frames is None or current_frame_count < self.max_frames)
+                       and current_frame_count + 1 in self.frame_timestamps
+                       and self.get_blur_value(current_frame_count) < self.blur_threshold):
+                    current_frame_count += 1
 
-            frame_time, frame_data = self.frame_timestamps[current_frame_count]
-            output_path = os.path.join(output_dir, f"frame_{current_frame_count}.jpg")
-            cv2.imwrite(output_path, frame_data)
+                frame_time, frame_data = self.frame_timestamps[current_frame_count]
+                if archive is not None:
+                    archive.add(current_frame_count, frame_data, blur_value=self.get_blur_value(current_frame_count),
+                                scene_change_frame_num=frame_num)
+                else:
+                    output_path = os.path.join(output_dir, f"frame_{current_frame_count}.jpg")
+                    cv2.imwrite(output_path, frame_data)
+        finally:
+            if archive is not None:
+                archive.close()
 
+    def open_archive(self, output_dir):
+        """
+        Opens a new keyframe archive in the output directory if frames are saved to an archive.
 
-# "videos/webcam-exact-resized.mp4"
-# "videos/sample-video.mp4"
-# "videos/living-room-sample-resized.mp4"
-# "videos/living-room-sample-video.mp4"
+        Every run writes a fresh archive, like the JPEG mode overwrites the frames of an earlier run. Key frames are
+        only saved after processing, so a crash before close() leaves an archive without index, which reads as empty.
+        Appending to an archive across sessions is available through KeyframeArchive mode "a".
 
+        Args:
+            output_dir (str): Output directory.
 
-# Example usage
-video_processor = VideoProcessor(video_source="videos/living-room-sample-video.mp4",
-                                 blur_threshold=60, content_threshold=15,
-                                 save_scene_changes=True, save_blur_frames=True)
-video_processor.process_video()
+        Returns:
+            KeyframeArchive: The opened archive, or None if frames are saved as separate JPEG files.
+        """
+        if self.output_format != "archive":
+            return None
+        return KeyframeArchive(os.path.join(output_dir, "keyframes.kfa"), mode="w")
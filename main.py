@@ -0,0 +1,188 @@
+import argparse
+import os
+import sys
+import time
+
+
+# Sample videos:
+# "videos/webcam-exact-resized.mp4"
+# "videos/sample-video.mp4"
+# "videos/living-room-sample-resized.mp4"
+# "videos/living-room-sample-video.mp4"
+
+
+def parse_source(source):
+    """
+    Parses a video source argument, digit-only sources are opened as camera indices.
+
+    Args:
+        source (str): The source argument.
+
+    Returns:
+        str or int: Path to the video file, or index of a live camera.
+    """
+    return int(source) if source.isdigit() else source
+
+
+def positive_int(value):
+    """
+    Parses a positive integer argument.
+
+    Args:
+        value (str): The argument.
+
+    Returns:
+        int: The parsed value.
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def parse_args(argv=None):
+    """
+    Parses the command line arguments.
+
+    Args:
+        argv (list, optional): Arguments to parse. Default is sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Detect scene changes and select non-blurred key frames in videos.")
+    parser.add_argument("sources", nargs="+", type=parse_source,
+                        help="Paths to the video files to process, or indices of live cameras (e.g. 0).")
+    parser.add_argument("--blur-threshold", type=float, default=60,
+                        help="Blur threshold value. Default is 60.")
+    parser.add_argument("--content-threshold", type=int, default=15,
+                        help="Content threshold value for scene change detection. Default is 15.")
+    parser.add_argument("--max-frames", type=int, default=500,
+                        help="Number of the last frame to process per video, 0 processes whole videos. Default is 500.")
+    parser.add_argument("--output-dir", default="output",
+                        help="Directory the key frames are saved to, one sub directory per video. Default is 'output'.")
+    parser.add_argument("--save-scene-changes", action=argparse.BooleanOptionalAction, default=True,
+                        help="Save the detected scene change frames.")
+    parser.add_argument("--save-blur-frames", action=argparse.BooleanOptionalAction, default=True,
+                        help="Save the frames above the blur threshold.")
+    parser.add_argument("--output-format", choices=("jpg", "archive"), default="jpg",
+                        help="Save one JPEG file per key frame, or all key frames and their metrics to a single "
+                             "keyframes.kfa archive per output directory. Default is 'jpg'.")
+    parser.add_argument("--target-fps", type=float, default=None,
+                        help="Frame rate processing has to keep up with. Enables load shedding if set.")
+    parser.add_argument("--candidate-cuts", action="store_true",
+                        help="Only decode the frames around candidate cuts found in the packet metadata (needs PyAV).")
+    parser.add_argument("--candidate-window", type=positive_int, default=30,
+                        help="Number of frames decoded before and after each candidate cut. Default is 30.")
+    return parser.parse_args(argv)
+
+
+def video_names(sources):
+    """
+    Returns a unique output name for every video source.
+
+    The name is the file name without extension. Videos sharing a file name, e.g. a/clip.mp4 and b/clip.mp4,
+    get their position in the sources appended so that they do not overwrite each other's key frames. The suffix
+    is repeated until the name clashes neither with another video's file name nor with a name already given out.
+
+    Args:
+        sources (list): Paths to the video files, or indices of live cameras.
+
+    Returns:
+        list: The output names, in the order of the sources.
+    """
+    stems = [f"camera_{video_source}" if isinstance(video_source, int)
+             else os.path.splitext(os.path.basename(video_source))[0] for video_source in sources]
+    names = []
+    for index, stem in enumerate(stems):
+        name = f"{stem}_{index}" if stems.count(stem) > 1 else stem
+        while name in names or (name != stem and name in stems):
+            name = f"{name}_{index}"
+        names.append(name)
+    return names
+
+
+def output_dirs(output_dir, video_name):
+    """
+    Returns the output directories for the key frames of a video.
+
+    Args:
+        output_dir (str): Root output directory.
+        video_name (str): Output name of the video, see video_names().
+
+    Returns:
+        tuple: The scene change and the blur threshold frame directories.
+    """
+    video_dir = os.path.join(output_dir, video_name)
+    return os.path.join(video_dir, "scene_changes"), os.path.join(video_dir, "no_blur_scene_changes")
+
+
+def main(argv=None):
+    """
+    Processes all video sources in one process, reusing the detectors between videos.
+
+    Args:
+        argv (list, optional): Arguments to parse. Default is sys.argv[1:].
+
+    Returns:
+        int: Exit code, 1 if any video failed to process, otherwise 0.
+    """
+    args = parse_args(argv)
+
+    startup_start = time.time()
+    # cv2 and scenedetect are only imported once the arguments are valid, so --help and usage errors stay fast
+    from VideoProcessor import VideoProcessor
+    if args.candidate_cuts:
+        from PacketReader import PacketReader
+
+    max_frames = args.max_frames or None
+    names = video_names(args.sources)
+    scene_changes_dir, blur_frames_dir = output_dirs(args.output_dir, names[0])
+    video_processor = VideoProcessor(video_source=args.sources[0],
+                                     blur_threshold=args.blur_threshold, content_threshold=args.content_threshold,
+                                     save_scene_changes=args.save_scene_changes, save_blur_frames=args.save_blur_frames,
+                                     target_fps=args.target_fps, scene_changes_dir=scene_changes_dir,
+                                     blur_frames_dir=blur_frames_dir, output_format=args.output_format,
+                                     max_frames=max_frames)
+    startup_time = time.time() - startup_start
+    print(f"Startup time (in seconds): {startup_time:.3f}")
+
+    total_processing_time = 0.0
+    failures = []
+    for index, video_source in enumerate(args.sources):
+        processing_start = time.time()
+
+        # A failing video is reported and skipped, so that it does not abort the rest of the batch
+        try:
+            frame_ranges = None
+            # A live camera has no packets to scan ahead of decoding
+            if args.candidate_cuts and not isinstance(video_source, int):
+                packet_reader = PacketReader(video_source, window=args.candidate_window)
+                frame_ranges = packet_reader.find_candidate_ranges(max_frames=max_frames)
+                print(f"Candidate cut ranges for {video_source}: {frame_ranges}")
+
+            if index > 0 or frame_ranges is not None:
+                scene_changes_dir, blur_frames_dir = output_dirs(args.output_dir, names[index])
+                video_processor.load_source(video_source, scene_changes_dir=scene_changes_dir,
+                                            blur_frames_dir=blur_frames_dir, frame_ranges=frame_ranges)
+
+            video_processor.process_video()
+        except Exception as e:
+            failures.append((video_source, e))
+            print(f"Failed to process {video_source}: {e!r}")
+            continue
+        finally:
+            processing_time = time.time() - processing_start
+            total_processing_time += processing_time
+
+        print(f"Processed {video_source} in {processing_time:.3f} seconds")
+
+    print(f"Total processing time (in seconds): {total_processing_time:.3f}")
+    print(f"Processed {len(args.sources) - len(failures)} of {len(args.sources)} videos")
+    for video_source, error in failures:
+        print(f"  Failed: {video_source}: {error!r}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+import os
+
+import pytest
+
+pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+from KeyframeArchive import KeyframeArchive
+
+
+@pytest.fixture
+def archive_path(tmp_path):
+    return str(tmp_path / "keyframes.kfa")
+
+
+def test_write_and_read(archive_path):
+    with KeyframeArchive(archive_path, mode="w") as archive:
+        archive.add_encoded(9, b"defg", blur_value=2.0)
+        archive.add_encoded(5, b"abc", blur_value=1.5, elapsed_time=0.25)
+
+    with KeyframeArchive(archive_path) as archive:
+        assert archive.frame_nums() == [5, 9]
+        assert len(archive) == 2
+        assert 5 in archive
+        assert archive.read_encoded(5) == b"abc"
+        assert archive.read_encoded(9) == b"defg"
+        assert archive.metadata(5) == {"blur_value": 1.5, "elapsed_time": 0.25}
+
+
+def test_encode_and_decode_frame(archive_path):
+    frame = np.zeros((16, 16, 3), dtype=np.uint8)
+    with KeyframeArchive(archive_path, mode="w", image_format=".png") as archive:
+        archive.add(1, frame)
+
+    with KeyframeArchive(archive_path) as archive:
+        assert archive.image_format == ".png"
+        assert np.array_equal(archive.read(1), frame)
+
+
+def test_metrics_named_like_index_fields(archive_path):
+    with KeyframeArchive(archive_path, mode="w") as archive:
+        archive.add_encoded(1, b"x", offset=7, length=99)
+
+    with KeyframeArchive(archive_path) as archive:
+        assert archive.read_encoded(1) == b"x"
+        assert archive.metadata(1) == {"offset": 7, "length": 99}
+
+
+def test_duplicate_frames_are_skipped(archive_path):
+    with KeyframeArchive(archive_path, mode="w") as archive:
+        archive.add_encoded(1, b"first")
+        archive.add_encoded(1, b"second")
+
+    with KeyframeArchive(archive_path) as archive:
+        assert archive.read_encoded(1) == b"first"
+
+
+def test_append_and_reopen(archive_path):
+    with KeyframeArchive(archive_path, mode="a") as archive:
+        archive.add_encoded(1, b"one")
+    with KeyframeArchive(archive_path, mode="a") as archive:
+        archive.add_encoded(2, b"two")
+
+    with KeyframeArchive(archive_path) as archive:
+        assert archive.frame_nums() == [1, 2]
+        assert archive.read_encoded(1) == b"one"
+        assert archive.read_encoded(2) == b"two"
+
+
+def test_interrupted_append_keeps_previous_frames(archive_path):
+    with KeyframeArchive(archive_path, mode="w") as archive:
+        archive.add_encoded(1, b"one")
+
+    archive = KeyframeArchive(archive_path, mode="a")
+    archive.add_encoded(2, b"two")
+    # Simulate the process dying before close()
+    archive._file.close()
+
+    with KeyframeArchive(archive_path) as archive:
+        assert archive.frame_nums() == [1]
+        assert archive.read_encoded(1) == b"one"
+
+
+def test_unclosed_new_archive_reads_as_empty(archive_path):
+    archive = KeyframeArchive(archive_path, mode="w")
+    archive.add_encoded(1, b"one")
+    archive._file.close()
+
+    with KeyframeArchive(archive_path) as archive:
+        assert len(archive) == 0
+
+
+def test_append_without_frames_does_not_grow(archive_path):
+    with KeyframeArchive(archive_path, mode="w") as archive:
+        archive.add_encoded(1, b"one")
+    size = os.path.getsize(archive_path)
+
+    with KeyframeArchive(archive_path, mode="a"):
+        pass
+
+    assert os.path.getsize(archive_path) == size
+
+
+def test_compact_removes_old_indexes(archive_path):
+    for frame_num in range(1, 6):
+        with KeyframeArchive(archive_path, mode="a") as archive:
+            archive.add_encoded(frame_num, b"frame", blur_value=frame_num)
+    size = os.path.getsize(archive_path)
+
+    KeyframeArchive.compact(archive_path)
+
+    assert os.path.getsize(archive_path) < size
+    with KeyframeArchive(archive_path) as archive:
+        assert archive.frame_nums() == [1, 2, 3, 4, 5]
+        assert archive.metadata(3) == {"blur_value": 3}
+        assert archive.read_encoded(5) == b"frame"
+
+
+def test_reading_other_files_fails(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not an archive at all")
+    with pytest.raises(ValueError):
+        KeyframeArchive(str(path))
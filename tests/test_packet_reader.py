@@ -0,0 +1,106 @@
+from fractions import Fraction
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("av")
+
+import PacketReader as packet_reader_module
+from PacketReader import PacketReader
+
+
+def make_packets(frame_count, keyframes, spikes=(), inter_size=100, keyframe_size=5000, spike_size=1000):
+    """
+    Builds synthetic (frame_num, size, is_keyframe) packets.
+    """
+    packets = []
+    for frame_num in range(1, frame_count + 1):
+        if frame_num in keyframes:
+            packets.append((frame_num, keyframe_size, True))
+        else:
+            packets.append((frame_num, spike_size if frame_num in spikes else inter_size, False))
+    return packets
+
+
+def make_reader(packets, window=30):
+    reader = PacketReader("synthetic.mp4", window=window)
+    reader.packets = packets
+    return reader
+
+
+def test_regular_keyframes_are_no_candidates():
+    reader = make_reader(make_packets(1000, keyframes={1, 251, 501, 751}))
+    assert reader.find_candidate_cuts() == []
+
+
+def test_early_keyframe_in_short_clip_is_candidate():
+    # Keyframe intervals [79, 250] tie, the cut keyframe at 80 must still be found
+    reader = make_reader(make_packets(400, keyframes={1, 80, 330}))
+    assert reader.find_candidate_cuts() == [80]
+
+
+def test_early_keyframe_between_regular_keyframes_is_candidate():
+    reader = make_reader(make_packets(1000, keyframes={1, 251, 300, 550, 800}))
+    assert reader.find_candidate_cuts() == [300]
+
+
+def test_packet_size_spike_is_candidate():
+    reader = make_reader(make_packets(500, keyframes={1, 251}, spikes={120}))
+    assert reader.find_candidate_cuts() == [120]
+
+
+def test_candidate_ranges_are_merged_and_cut_off():
+    reader = make_reader(make_packets(1000, keyframes={1, 251, 501, 751}, spikes={100, 120, 400, 900}), window=10)
+    assert reader.find_candidate_ranges() == [(90, 130), (390, 410), (890, 910)]
+    assert reader.find_candidate_ranges(max_frames=405) == [(90, 130), (390, 405)]
+
+
+def test_window_must_be_positive():
+    with pytest.raises(ValueError):
+        PacketReader("synthetic.mp4", window=0)
+
+
+class FakeContainer:
+    """
+    Container yielding synthetic packets and counting how many were demuxed.
+    """
+
+    def __init__(self, packets, average_rate=Fraction(30)):
+        self.packets = packets
+        self.demuxed = 0
+        stream = SimpleNamespace(average_rate=average_rate, guessed_rate=None, time_base=Fraction(1, 30))
+        self.streams = SimpleNamespace(video=[stream])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def demux(self, stream):
+        for packet in self.packets:
+            self.demuxed += 1
+            yield packet
+
+
+def fake_packets(frame_count, keyframe_interval=250, pts=True):
+    return [SimpleNamespace(pts=frame_num if pts else None, size=100, is_keyframe=frame_num % keyframe_interval == 0)
+            for frame_num in range(frame_count)]
+
+
+def test_demuxing_stops_after_frame_limit(monkeypatch):
+    container = FakeContainer(fake_packets(100000))
+    monkeypatch.setattr(packet_reader_module.av, "open", lambda source: container)
+    reader = PacketReader("synthetic.mp4", window=30)
+    assert reader.find_candidate_ranges(max_frames=500) == []
+    assert container.demuxed <= 500 + 30 + 1
+
+
+@pytest.mark.parametrize("container", [
+    FakeContainer(fake_packets(100, keyframe_interval=1)),
+    FakeContainer(fake_packets(100, pts=False)),
+    FakeContainer(fake_packets(100), average_rate=None),
+])
+def test_unusable_metadata_falls_back_to_full_decode(monkeypatch, container):
+    monkeypatch.setattr(packet_reader_module.av, "open", lambda source: container)
+    assert PacketReader("synthetic.mp4").find_candidate_ranges() is None